@@ -12,7 +12,6 @@ setup(
     install_requires=[
         "fannypack",
         "hypothesis",
-        "overrides",
         "pytest",
         "scipy",
         "torch",
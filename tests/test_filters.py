@@ -50,6 +50,43 @@ def test_particle_filter_soft_resample(generated_data):
     )
 
 
+def test_particle_filter_argmax(generated_data):
+    """Smoke test for particle filter with argmax state estimation."""
+    _run_filter(
+        torchfilter.filters.ParticleFilter(
+            dynamics_model=LinearDynamicsModel(),
+            measurement_model=LinearParticleFilterMeasurementModel(),
+            estimation_method="argmax",
+        ),
+        generated_data,
+    )
+
+
+def test_particle_filter_reduced_precision(generated_data):
+    """Smoke test for particle filter with reduced-precision particle storage."""
+    filter_model = torchfilter.filters.ParticleFilter(
+        dynamics_model=LinearDynamicsModel(),
+        measurement_model=LinearParticleFilterMeasurementModel(),
+        resample=True,
+        particle_dtype=torch.bfloat16,
+    )
+    _run_filter(filter_model, generated_data)
+    assert filter_model.particle_states.dtype == torch.bfloat16
+    assert filter_model.particle_log_weights.dtype == torch.bfloat16
+
+
+def test_particle_filter_compiled(generated_data):
+    """Smoke test for particle filter with a torch.compile'd forward pass."""
+    _run_filter(
+        torchfilter.filters.ParticleFilter(
+            dynamics_model=LinearDynamicsModel(),
+            measurement_model=LinearParticleFilterMeasurementModel(),
+            compile_forward=True,
+        ),
+        generated_data,
+    )
+
+
 def test_particle_filter_dynamic_particle_count(generated_data):
     """Smoke test for particle filter with a dynamically changing particle count + no resampling."""
     filter_model = torchfilter.filters.ParticleFilter(
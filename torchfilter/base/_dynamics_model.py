@@ -7,7 +7,6 @@ from typing import List, Tuple
 import fannypack
 import torch
 import torch.nn as nn
-from overrides import overrides
 
 from .. import types
 
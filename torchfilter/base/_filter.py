@@ -5,7 +5,6 @@ import abc
 
 import fannypack
 import torch.nn as nn
-from overrides import overrides
 
 from .. import types
 
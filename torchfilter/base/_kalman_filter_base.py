@@ -5,7 +5,6 @@ import abc
 
 import fannypack as fp
 import torch
-from overrides import overrides
 
 from .. import types
 from ._dynamics_model import DynamicsModel
@@ -50,7 +49,6 @@ class KalmanFilterBase(Filter, abc.ABC):
         # Throw an error if our filter is used before `.initialize_beliefs()` is called
         self._initialized = False
 
-    @overrides
     def forward(
         self,
         *,
@@ -86,7 +84,6 @@ class KalmanFilterBase(Filter, abc.ABC):
         # Return mean
         return self.belief_mean
 
-    @overrides
     def initialize_beliefs(
         self, *, mean: types.StatesTorch, covariance: types.CovarianceTorch
     ) -> None:
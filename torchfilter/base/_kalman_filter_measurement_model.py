@@ -6,7 +6,6 @@ from typing import Tuple
 
 import torch
 import torch.nn as nn
-from overrides import overrides
 
 from .. import types
 
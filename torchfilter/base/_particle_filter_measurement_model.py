@@ -2,11 +2,11 @@
 """
 
 import abc
+import math
 from typing import cast
 
 import torch
 import torch.nn as nn
-from overrides import overrides
 
 from .. import types
 from ._kalman_filter_measurement_model import KalmanFilterMeasurementModel
@@ -58,7 +58,6 @@ class ParticleFilterMeasurementModelWrapper(ParticleFilterMeasurementModel):
         super().__init__(state_dim=kalman_filter_measurement_model.state_dim)
         self.kalman_filter_measurement_model = kalman_filter_measurement_model
 
-    @overrides
     def forward(
         self, *, states: types.StatesTorch, observations: types.ObservationsTorch
     ) -> torch.Tensor:
@@ -101,14 +100,19 @@ class ParticleFilterMeasurementModelWrapper(ParticleFilterMeasurementModel):
             (N, M, observation_dim, observation_dim)
         )
 
-        # Expand observations to account for particle count
-        # This is currently not very memory-efficient
-        observations = observations[:, None, :].expand((N, M, observation_dim))
-
-        # Compute log likelihoods
-        log_likelihoods = torch.distributions.MultivariateNormal(
-            loc=pred_observations, scale_tril=observations_tril
-        ).log_prob(observations)
+        # Compute log-likelihoods under N(pred_observations, R); evaluating the
+        # Gaussian density manually lets observations broadcast against the
+        # particle dimension without materializing an (N, M, observation_dim)
+        # expansion, and skips `torch.distributions` overhead
+        innovations = observations[:, None, :] - pred_observations
+        whitened = torch.linalg.solve_triangular(
+            observations_tril, innovations[:, :, :, None], upper=False
+        )[..., 0]
+        half_log_det = torch.diagonal(observations_tril, dim1=-2, dim2=-1).log().sum(-1)
+        log_likelihoods = (
+            -0.5 * (whitened.square().sum(-1) + observation_dim * math.log(2.0 * math.pi))
+            - half_log_det
+        )
         assert log_likelihoods.shape == (N, M)
 
         # Reshape and return
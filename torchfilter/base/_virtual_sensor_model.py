@@ -5,7 +5,6 @@ import abc
 from typing import Tuple
 
 import torch.nn as nn
-from overrides import overrides
 
 from .. import types
 
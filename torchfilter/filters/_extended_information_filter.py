@@ -4,7 +4,6 @@ from typing import cast
 
 import fannypack
 import torch
-from overrides import overrides
 
 from .. import types
 from ..base import DynamicsModel, KalmanFilterBase, KalmanFilterMeasurementModel
@@ -50,7 +49,6 @@ class ExtendedInformationFilter(KalmanFilterBase):
             torch.linalg.cholesky(covariance)
         )
 
-    @overrides
     def _predict_step(self, *, controls: types.ControlsTorch) -> None:
         # Get previous belief
         prev_mean = self._belief_mean
@@ -86,7 +84,6 @@ class ExtendedInformationFilter(KalmanFilterBase):
         self.information_matrix = pred_information_matrix
         self.information_vector = pred_information_vector
 
-    @overrides
     def _update_step(self, *, observations: types.ObservationsTorch) -> None:
         # Extract/validate inputs
         assert isinstance(
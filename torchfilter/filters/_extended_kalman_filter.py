@@ -4,7 +4,6 @@
 from typing import cast
 
 import torch
-from overrides import overrides
 
 from .. import types
 from ..base import KalmanFilterBase
@@ -17,7 +16,6 @@ class ExtendedKalmanFilter(KalmanFilterBase):
     `VirtualSensorExtendedKalmanFilter`.
     """
 
-    @overrides
     def _predict_step(self, *, controls: types.ControlsTorch) -> None:
         # Get previous belief
         prev_mean = self._belief_mean
@@ -45,7 +43,6 @@ class ExtendedKalmanFilter(KalmanFilterBase):
         self._belief_mean = pred_mean
         self._belief_covariance = pred_covariance
 
-    @overrides
     def _update_step(self, *, observations: types.ObservationsTorch) -> None:
         # Extract/validate inputs
         assert isinstance(
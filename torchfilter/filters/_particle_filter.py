@@ -1,16 +1,58 @@
 """Private module; avoid importing from directly.
 """
 
-from typing import Optional
+import math
+from typing import Optional, Tuple
 
 import fannypack
-import numpy as np
 import torch
-from overrides import overrides
 
 from .. import types
 from ..base import DynamicsModel, Filter, ParticleFilterMeasurementModel
-torch.autograd.set_detect_anomaly(True)
+from ._particle_gather import gather_particles
+from ._systematic_resampling import numba_available, systematic_resample_indices_cpu
+
+
+@torch.jit.script
+def _pf_update(
+    log_weights: torch.Tensor,
+    observation_log_likelihoods: torch.Tensor,
+    states: torch.Tensor,
+    inplace: bool,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Re-weight particles and compute the weighted-average state estimate.
+
+    Scripted so the elementwise chain (add, normalize, softmax) fuses into as
+    few kernels as possible. Reductions are run in full precision, so inputs
+    may be stored in a reduced-precision dtype (eg bfloat16). When `inplace`
+    (only safe with autograd disabled), full-precision weights are updated
+    without allocating a new (N, M) tensor.
+    """
+    if inplace and log_weights.dtype == torch.float32:
+        new_log_weights = log_weights.add_(observation_log_likelihoods)
+    else:
+        new_log_weights = log_weights.float() + observation_log_likelihoods.float()
+    # No explicit normalization needed: softmax is invariant to shifts, so
+    # exp(log_w - logsumexp(log_w)) == softmax(log_w)
+    state_estimates = torch.einsum(
+        "nm,nmd->nd", torch.softmax(new_log_weights.float(), dim=1), states.float()
+    )
+    return new_log_weights.to(log_weights.dtype), state_estimates
+
+
+@torch.jit.script
+def _soft_resample_logits(
+    log_weights: torch.Tensor, log_alpha: float, uniform_log_mix: float
+) -> torch.Tensor:
+    """Soft-resampling sample logits: log(alpha * w + (1 - alpha) * uniform).
+
+    Uses the identity logaddexp(a, b) = max(a, b) + log1p(exp(-|a - b|)) with a
+    scalar uniform term, so no stacked (2, N, M) tensor is ever built; scripted
+    so the elementwise chain fuses into one kernel.
+    """
+    a = log_weights + log_alpha
+    maximum = torch.clamp_min(a, uniform_log_mix)
+    return maximum + torch.log1p(torch.exp(-(a - uniform_log_mix).abs()))
 
 
 class ParticleFilter(Filter):
@@ -25,6 +67,9 @@ class ParticleFilter(Filter):
         resample: Optional[bool] = None,
         soft_resample_alpha: float = 1.0,
         estimation_method: str = "weighted_average",
+        particle_dtype: Optional[torch.dtype] = None,
+        use_cuda_graph: bool = False,
+        compile_forward: bool = False,
     ):
         # Check submodule consistency
         assert isinstance(dynamics_model, DynamicsModel)
@@ -56,6 +101,17 @@ class ParticleFilter(Filter):
         Localization": https://arxiv.org/abs/1805.08975
         Defaults to 1.0 (disabled)."""
 
+        # Precomputed log-domain constants, to keep scalar log evaluations off
+        # the per-step path; log1p for precision when alpha is near 1. The
+        # -log(M) cache is keyed on the particle count, since `num_particles`
+        # can be adjusted after construction.
+        self._log_alpha: float = 0.0
+        self._log_1m_alpha: float = 0.0
+        if soft_resample_alpha < 1.0:
+            self._log_alpha = math.log(soft_resample_alpha)
+            self._log_1m_alpha = math.log1p(-soft_resample_alpha)
+        self._neg_log_M_cache = (num_particles, -math.log(num_particles))
+
         assert estimation_method in ("weighted_average", "argmax")
         self.estimation_method = estimation_method
         """str: Method of producing state estimates. Options include:
@@ -63,6 +119,44 @@ class ParticleFilter(Filter):
         - 'argmax': state of highest weighted particle.
         """
 
+        self.particle_dtype = particle_dtype
+        """Optional[torch.dtype]: Reduced-precision dtype (eg `torch.bfloat16`)
+        for storing particle states and log-weights, which halves memory
+        traffic on the hot path. Dynamics/measurement model evaluations and
+        weight reductions still run in full precision. If unset (None), we
+        store particles in the dtype of the initial belief."""
+
+        self.use_cuda_graph = use_cuda_graph
+        """bool: If True, we capture the forward pass as a CUDA graph once
+        input shapes are fixed and replay it with a single graph launch per
+        timestep, eliminating per-kernel dispatch overhead. Only used at
+        inference time (eval mode, no gradients) on CUDA tensors. Defaults to
+        False."""
+
+        self.compile_forward = compile_forward
+        """bool: If True, we run the forward pass through
+        `torch.compile(..., mode="reduce-overhead", dynamic=False)`, which
+        specializes on the concrete `(N, M, state_dim)` shapes and lets
+        Inductor fuse the weight update/normalization/estimation chain.
+        Mutually exclusive with `use_cuda_graph`, since reduce-overhead mode
+        already applies CUDA graphs where it can. Defaults to False."""
+        assert not (use_cuda_graph and compile_forward), (
+            "use_cuda_graph and compile_forward are mutually exclusive"
+        )
+        self._compiled_forward = (
+            torch.compile(self._forward_impl, mode="reduce-overhead", dynamic=False)
+            if compile_forward
+            else None
+        )
+
+        # CUDA graph state; populated lazily on the first eligible forward pass
+        self._graph: Optional[torch.cuda.CUDAGraph] = None
+        self._static_observations: types.ObservationsTorch
+        self._static_controls: types.ControlsTorch
+        self._static_estimates: torch.Tensor
+        self._static_num_particles: int
+        self._static_belief_shapes: Tuple[torch.Size, torch.Size]
+
         # "Hidden state" tensors
         self.particle_states: torch.Tensor
         """torch.Tensor: Discrete particles representing our current belief
@@ -74,7 +168,26 @@ class ParticleFilter(Filter):
         """
         self._initialized = False
 
-    @overrides
+        # Cached index tensor; saves a small allocation + kernel launch each
+        # time we need an arange on the hot path. Grown lazily as needed.
+        self.register_buffer(
+            "_arange_cache", torch.arange(num_particles), persistent=False
+        )
+
+    def _neg_log_M(self, count: int) -> float:
+        """Returns `-log(count)`, cached on the previous particle count."""
+        if self._neg_log_M_cache[0] != count:
+            self._neg_log_M_cache = (count, -math.log(count))
+        return self._neg_log_M_cache[1]
+
+    def _arange(self, length: int) -> torch.Tensor:
+        """Returns `torch.arange(length)` from a cached buffer."""
+        if self._arange_cache.shape[0] < length:
+            self._arange_cache = torch.arange(
+                length, device=self._arange_cache.device
+            )
+        return self._arange_cache[:length]
+
     def initialize_beliefs(
         self, *, mean: types.StatesTorch, covariance: types.CovarianceTorch
     ) -> None:
@@ -91,25 +204,28 @@ class ParticleFilter(Filter):
         assert covariance.shape == (N, self.state_dim, self.state_dim)
         M = self.num_particles
 
-        # Sample particles
-        self.particle_states = (
-            torch.distributions.MultivariateNormal(mean, covariance)
-            .sample((M,))
-            .transpose(0, 1)
+        # Sample particles; manual reparameterization is cheaper than building
+        # `torch.distributions.MultivariateNormal` objects
+        scale_tril = torch.linalg.cholesky(covariance)
+        eps = torch.randn((N, M, self.state_dim), device=mean.device, dtype=mean.dtype)
+        self.particle_states = mean[:, None, :] + torch.einsum(
+            "nij,nmj->nmi", scale_tril, eps
         )
-        print(f"Particles initialized with version : {self.particle_states._version}")
+        if self.particle_dtype is not None:
+            self.particle_states = self.particle_states.to(self.particle_dtype)
         assert self.particle_states.shape == (N, M, self.state_dim)
 
         # Normalize weights
         self.particle_log_weights = self.particle_states.new_full(
-            (N, M), float(-np.log(M, dtype=np.float32))
+            (N, M), self._neg_log_M(M)
         )
         assert self.particle_log_weights.shape == (N, M)
 
-        # Set initialized flag
+        # Set initialized flag; invalidate any captured CUDA graph, since it
+        # holds references to the previous belief tensors
+        self._graph = None
         self._initialized = True
 
-    @overrides
     def forward(
         self,
         *,
@@ -132,7 +248,29 @@ class ParticleFilter(Filter):
         # Make sure our particle filter's been initialized
         assert self._initialized, "Particle filter not initialized!"
 
-        print(f"At beginning of forward, particles have version : {self.particle_states._version}")
+        # CUDA graph path: only valid at inference time, with fixed shapes
+        if (
+            self.use_cuda_graph
+            and self.particle_states.is_cuda
+            and not self.training
+            and not torch.is_grad_enabled()
+        ):
+            return self._forward_cuda_graph(
+                observations=observations, controls=controls
+            )
+
+        if self._compiled_forward is not None:
+            return self._compiled_forward(observations=observations, controls=controls)
+
+        return self._forward_impl(observations=observations, controls=controls)
+
+    def _forward_impl(
+        self,
+        *,
+        observations: types.ObservationsTorch,
+        controls: types.ControlsTorch,
+    ) -> types.StatesTorch:
+        """Eager implementation of `forward`; see `forward` for details."""
 
         # Get our batch size (N), current particle count (M), & state dimension
         N, M, state_dim = self.particle_states.shape
@@ -151,32 +289,32 @@ class ParticleFilter(Filter):
         # our desired particle count, we need to either expand or contract our
         # particle set
         if not resample and self.num_particles != M:
-            indices = self.particle_states.new_zeros(
-                (N, self.num_particles), dtype=torch.long
-            )
+            index_chunks = []
 
             # If output particles > our input particles, for the beginning part we copy
             # particles directly to reduce variance
             copy_count = (self.num_particles // M) * M
             if copy_count > 0:
-                indices[:, :copy_count] = torch.arange(M).repeat(copy_count // M)[
-                    None, :
-                ]
+                index_chunks.append(self._arange(M).repeat(copy_count // M))
 
             # For remaining particles, we sample w/o replacement (also lowers variance)
             remaining_count = self.num_particles - copy_count
             assert remaining_count >= 0
             if remaining_count > 0:
-                indices[:, copy_count:] = torch.randperm(M, device=indices.device)[
-                    None, :remaining_count
-                ]
+                index_chunks.append(
+                    torch.randperm(M, device=self.particle_states.device)[
+                        :remaining_count
+                    ]
+                )
+
+            indices = torch.cat(index_chunks)[None, :].expand(N, self.num_particles)
 
             # Gather new particles, weights
             M = self.num_particles
-            self.particle_states = self.particle_states.gather(
-                1, indices[:, :, None].expand((N, M, state_dim))
+            self.particle_states = gather_particles(self.particle_states, indices)
+            self.particle_log_weights = torch.take_along_dim(
+                self.particle_log_weights, indices, dim=1
             )
-            self.particle_log_weights = self.particle_log_weights.gather(1, indices)
             assert self.particle_states.shape == (N, self.num_particles, state_dim)
             assert self.particle_log_weights.shape == (N, self.num_particles)
 
@@ -194,57 +332,61 @@ class ParticleFilter(Filter):
         # Currently each of the M particles within a "sample" get the same action, but
         # we could also add noise in the action space (a la Jonschkowski et al. 2018)
         reshaped_states = self.particle_states.reshape(-1, self.state_dim)
+        if self.particle_dtype is not None:
+            # Dynamics models run in full precision
+            reshaped_states = reshaped_states.float()
         reshaped_controls = fannypack.utils.SliceWrapper(controls).map(
-            lambda tensor: torch.repeat_interleave(tensor, repeats=M, dim=0)
+            # `expand` + `reshape` produces the same repeated layout as
+            # `torch.repeat_interleave`; `reshape` still materializes the copy
+            # (it can't view a stride-0 dim), but does so with a cheap
+            # broadcast contiguification instead of an index-based kernel
+            lambda tensor: tensor.unsqueeze(1)
+            .expand((tensor.shape[0], M) + tensor.shape[1:])
+            .reshape((tensor.shape[0] * M,) + tensor.shape[1:])
         )
         predicted_states, scale_trils = self.dynamics_model(
             initial_states=reshaped_states, controls=reshaped_controls
         )
-        self.particle_states = (
-            torch.distributions.MultivariateNormal(
-                loc=predicted_states, scale_tril=scale_trils
-            )
-            .rsample()  # Note that we use `rsample` to make sampling differentiable
-            .view(N, M, self.state_dim)
-        )
+        # Reparameterized sampling keeps this differentiable, like `rsample()`,
+        # without the per-step overhead of constructing distribution objects
+        eps = torch.randn_like(predicted_states)
+        noise = torch.einsum("bij,bj->bi", scale_trils, eps)
+        self.particle_states = (predicted_states + noise).view(N, M, self.state_dim)
+        if self.particle_dtype is not None:
+            self.particle_states = self.particle_states.to(self.particle_dtype)
         assert self.particle_states.shape == (N, M, self.state_dim)
 
-        print(f"After resampling, particles have version : {self.particle_states._version}")
-
         # Re-weight particles using observations
-        self.particle_log_weights = self.particle_log_weights + self.measurement_model(
-            states=self.particle_states,
+        measurement_states = self.particle_states
+        if self.particle_dtype is not None:
+            # Measurement models run in full precision
+            measurement_states = measurement_states.float()
+        observation_log_likelihoods = self.measurement_model(
+            states=measurement_states,
             observations=observations,
-        )
-
-        # Normalize particle weights to sum to 1.0
-        self.particle_log_weights = self.particle_log_weights - torch.logsumexp(
-            self.particle_log_weights, dim=1, keepdim=True
-        )
-
-        print(f"After re-weighting, particles have version : {self.particle_states._version}")
+        ).to(self.particle_log_weights.dtype)
 
         # Compute output
         state_estimates: types.StatesTorch
         if self.estimation_method == "weighted_average":
-
-            # First we expand our particle weights to be 3D
-            expanded_weights = self.particle_log_weights.unsqueeze(2)
-
-            print(f"Expanded weights have version : {expanded_weights._version}")
-
-            # Then we multiply each particle against its state 
-            weighted_states = self.particle_states * torch.exp(expanded_weights)
-
-            print(f"Weighted states have version : {weighted_states._version}")
-            print(f"Particle states have version : {self.particle_states._version}")
-
-            state_estimates = torch.sum(weighted_states, dim=1) 
+            # Scripted helper fuses the weight update, normalization, and
+            # weighted-average contraction
+            self.particle_log_weights, state_estimates = _pf_update(
+                self.particle_log_weights,
+                observation_log_likelihoods,
+                self.particle_states,
+                inplace=not torch.is_grad_enabled(),
+            )
         elif self.estimation_method == "argmax":
+            # Note that argmax is invariant to normalization, so we can skip it
+            if torch.is_grad_enabled():
+                self.particle_log_weights = (
+                    self.particle_log_weights + observation_log_likelihoods
+                )
+            else:
+                self.particle_log_weights.add_(observation_log_likelihoods)
             best_indices = torch.argmax(self.particle_log_weights, dim=1)
-            state_estimates = torch.gather(
-                self.particle_states, dim=1, index=best_indices
-            )
+            state_estimates = self.particle_states[self._arange(N), best_indices]
         else:
             assert False, "Unsupported estimation method!"
 
@@ -259,28 +401,160 @@ class ParticleFilter(Filter):
 
         return state_estimates
 
+    def _forward_cuda_graph(
+        self,
+        *,
+        observations: types.ObservationsTorch,
+        controls: types.ControlsTorch,
+    ) -> types.StatesTorch:
+        """Single-timestep forward pass via CUDA graph capture/replay.
+
+        The first eligible call captures the forward pass as a CUDA graph;
+        subsequent calls copy inputs into static buffers and replay the whole
+        step with one graph launch instead of one launch per kernel.
+        """
+        if self._graph is not None and not self._static_shapes_match(
+            observations=observations, controls=controls
+        ):
+            # Input shapes changed; drop the stale graph and recapture
+            self._graph = None
+
+        if self._graph is None:
+            self._capture_cuda_graph(observations=observations, controls=controls)
+
+        # Copy inputs into the captured graph's static buffers, then replay
+        self._copy_into(self._static_observations, observations)
+        self._copy_into(self._static_controls, controls)
+        self._graph.replay()
+
+        # Clone so downstream code can't alias memory that the next replay
+        # will overwrite
+        return self._static_estimates.clone()
+
+    def _capture_cuda_graph(
+        self,
+        *,
+        observations: types.ObservationsTorch,
+        controls: types.ControlsTorch,
+    ) -> None:
+        """Warm up and capture the forward pass as a CUDA graph."""
+        # Static input buffers; replays read inputs from these
+        self._static_observations = fannypack.utils.SliceWrapper(observations).map(
+            torch.clone
+        )
+        self._static_controls = fannypack.utils.SliceWrapper(controls).map(torch.clone)
+
+        # Belief "entry" buffers: capture starts from this state, and the
+        # captured graph ends by copying the updated belief back into them, so
+        # each replay correctly threads the recurrence
+        entry_states = self.particle_states.clone()
+        entry_log_weights = self.particle_log_weights.clone()
+
+        # Pre-warmup snapshot: warmup actually executes kernels (capture does
+        # not), and the in-place weight update writes through the belief
+        # tensors, so warmup must run on throwaway clones and the entry
+        # buffers must be restored before recording
+        snapshot_states = entry_states.clone()
+        snapshot_log_weights = entry_log_weights.clone()
+
+        # Warm up on a side stream, as required before graph capture
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(3):
+                self.particle_states = entry_states.clone()
+                self.particle_log_weights = entry_log_weights.clone()
+                self._forward_impl(
+                    observations=self._static_observations,
+                    controls=self._static_controls,
+                )
+        torch.cuda.current_stream().wait_stream(side_stream)
+
+        # Capture, starting from the pre-warmup belief
+        entry_states.copy_(snapshot_states)
+        entry_log_weights.copy_(snapshot_log_weights)
+        self.particle_states = entry_states
+        self.particle_log_weights = entry_log_weights
+        self._graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self._graph):
+            self._static_estimates = self._forward_impl(
+                observations=self._static_observations,
+                controls=self._static_controls,
+            )
+            entry_states.copy_(self.particle_states)
+            entry_log_weights.copy_(self.particle_log_weights)
+
+        # All future reads/writes of the belief go through the entry buffers
+        self.particle_states = entry_states
+        self.particle_log_weights = entry_log_weights
+
+        # Record what the graph was specialized on, for staleness checks
+        self._static_num_particles = self.num_particles
+        self._static_belief_shapes = (entry_states.shape, entry_log_weights.shape)
+
+    def _static_shapes_match(
+        self,
+        *,
+        observations: types.ObservationsTorch,
+        controls: types.ControlsTorch,
+    ) -> bool:
+        """Checks incoming inputs, the particle count, and the belief shapes
+        against what the captured graph was specialized on."""
+
+        # `num_particles` is a public attribute that can be adjusted
+        # mid-stream; replays skip the eager path's shape asserts, so a stale
+        # graph would silently keep the old particle count
+        if self.num_particles != self._static_num_particles:
+            return False
+        if (
+            self.particle_states.shape,
+            self.particle_log_weights.shape,
+        ) != self._static_belief_shapes:
+            return False
+
+        def shapes(data):
+            return fannypack.utils.SliceWrapper(data).map(lambda tensor: tensor.shape)
+
+        return shapes(self._static_observations) == shapes(observations) and shapes(
+            self._static_controls
+        ) == shapes(controls)
+
+    @staticmethod
+    def _copy_into(static, values) -> None:
+        """Copies a dict-or-tensor input into matching static buffers."""
+        if isinstance(static, dict):
+            for key, tensor in static.items():
+                tensor.copy_(values[key], non_blocking=True)
+        else:
+            static.copy_(values, non_blocking=True)
+
     def _resample(self) -> None:
-        """Resample particles."""
+        """Resample particles.
+
+        Note that this is written with explicit batched ops over the leading
+        `N` dimension rather than `torch.func.vmap` of a single-element
+        resampler: the two are equivalent here, but explicit batching keeps
+        the Triton/Numba fast paths and scripted helpers usable.
+        """
         # Note the distinction between `M`, the current number of particles, and
         # `self.num_particles`, the desired number of particles
         N, M, state_dim = self.particle_states.shape
 
         sample_logits: torch.Tensor
-        uniform_log_weights = self.particle_log_weights.new_full(
-            (N, self.num_particles), float(-np.log(M, dtype=np.float32))
-        )
+        uniform_log_weight = self._neg_log_M(M)
         if self.soft_resample_alpha < 1.0:
             # Soft resampling
             assert self.particle_log_weights.shape == (N, M)
-            sample_logits = torch.logsumexp(
-                torch.stack(
-                    [
-                        self.particle_log_weights + np.log(self.soft_resample_alpha),
-                        uniform_log_weights + np.log(1.0 - self.soft_resample_alpha),
-                    ],
-                    dim=0,
-                ),
-                dim=0,
+
+            # Mixing with the uniform distribution requires normalized weights;
+            # we skip normalization elsewhere, so normalize here
+            self.particle_log_weights = self.particle_log_weights - torch.logsumexp(
+                self.particle_log_weights, dim=1, keepdim=True
+            )
+            sample_logits = _soft_resample_logits(
+                self.particle_log_weights,
+                self._log_alpha,
+                uniform_log_weight + self._log_1m_alpha,
             )
             self.particle_log_weights = self.particle_log_weights - sample_logits
         else:
@@ -291,19 +565,31 @@ class ParticleFilter(Filter):
             # Note the distinction between M, the current # of particles,
             # and self.num_particles, the desired # of particles
             sample_logits = self.particle_log_weights
-            self.particle_log_weights = uniform_log_weights
+            self.particle_log_weights = self.particle_log_weights.new_full(
+                (N, self.num_particles), uniform_log_weight
+            )
 
         assert sample_logits.shape == (N, M)
-        distribution = torch.distributions.Categorical(logits=sample_logits)
-        state_indices = distribution.sample((self.num_particles,)).T
+
+        # Systematic (low-variance) resampling: a single uniform offset per
+        # batch element, then evenly spaced points walked along the weight CDF
+        weights = torch.softmax(sample_logits.float(), dim=1)
+        cdf = torch.cumsum(weights, dim=1)
+        u0 = torch.rand((N,), device=weights.device)
+        if numba_available and cdf.device.type == "cpu":
+            # Tight parallel loop; cheaper than searchsorted for CPU tensors
+            state_indices = systematic_resample_indices_cpu(
+                cdf, u0, self.num_particles
+            )
+        else:
+            uniforms = (
+                u0[:, None] + self._arange(self.num_particles)
+            ) / self.num_particles
+            state_indices = torch.searchsorted(cdf, uniforms).clamp_(max=M - 1)
         assert state_indices.shape == (N, self.num_particles)
 
-        self.particle_states = torch.gather(
-            self.particle_states,
-            dim=1,
-            index=state_indices[:, :, None].expand((N, self.num_particles, state_dim)),
-        )
-        # # ^This gather magic is equivalent to:
+        self.particle_states = gather_particles(self.particle_states, state_indices)
+        # # ^This gather is equivalent to:
         # particle_states_alt = torch.zeros_like(self.particle_states)
         # for i in range(N):
         #     particle_states_alt[i] = self.particle_states[i][state_indices[i]]
@@ -5,7 +5,6 @@ from typing import Optional, cast
 
 import fannypack
 import torch
-from overrides import overrides
 
 from .. import types, utils
 from ..base import DynamicsModel, KalmanFilterBase, KalmanFilterMeasurementModel
@@ -57,7 +56,6 @@ class SquareRootUnscentedKalmanFilter(KalmanFilterBase):
         self._belief_scale_tril = torch.linalg.cholesky(covariance)
         self._belief_covariance = covariance
 
-    @overrides
     def _predict_step(self, *, controls: types.ControlsTorch) -> None:
         """Predict step."""
         # See Merwe paper [1] for notation
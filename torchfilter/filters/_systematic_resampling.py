@@ -0,0 +1,60 @@
+"""Private module; avoid importing from directly.
+"""
+
+import numpy as np
+import torch
+
+try:
+    import numba
+
+    _numba_available = True
+except ImportError:
+    _numba_available = False
+
+
+if _numba_available:
+
+    @numba.njit(parallel=True, cache=True)
+    def _systematic_indices(
+        cum_weights: np.ndarray, u0: np.ndarray, out: np.ndarray
+    ) -> None:
+        # Walk each batch element's CDF once; both the uniforms and the CDF are
+        # monotonic, so the inner pointer only ever advances
+        N, M_in = cum_weights.shape
+        M_out = out.shape[1]
+        for n in numba.prange(N):
+            j = 0
+            for k in range(M_out):
+                target = (u0[n] + k) / M_out
+                while j < M_in - 1 and cum_weights[n, j] < target:
+                    j += 1
+                out[n, k] = j
+
+
+@torch.compiler.disable
+def systematic_resample_indices_cpu(
+    cdf: torch.Tensor, u0: torch.Tensor, num_samples: int
+) -> torch.Tensor:
+    """Systematic resampling indices for CPU tensors, via a parallel Numba loop.
+
+    Callers should check `numba_available` and fall back to
+    `torch.searchsorted` when Numba isn't installed.
+
+    Args:
+        cdf (torch.Tensor): Cumulative particle weights. Shape should be
+            `(N, M)`.
+        u0 (torch.Tensor): Uniform offsets in `[0, 1)`. Shape should be `(N,)`.
+        num_samples (int): Number of indices to draw per batch element.
+
+    Returns:
+        torch.Tensor: Sampled particle indices. Shape should be
+        `(N, num_samples)`.
+    """
+    assert _numba_available and cdf.device.type == "cpu"
+    out = np.empty((cdf.shape[0], num_samples), dtype=np.int64)
+    _systematic_indices(cdf.detach().numpy(), u0.numpy(), out)
+    return torch.from_numpy(out)
+
+
+numba_available = _numba_available
+"""bool: True if Numba is installed and the fast CPU path can be used."""
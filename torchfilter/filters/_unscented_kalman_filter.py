@@ -5,7 +5,6 @@ from typing import Optional, cast
 
 import fannypack
 import torch
-from overrides import overrides
 
 from .. import types, utils
 from ..base import DynamicsModel, KalmanFilterBase, KalmanFilterMeasurementModel
@@ -47,7 +46,6 @@ class UnscentedKalmanFilter(KalmanFilterBase):
         # belief distribution
         self._sigma_point_cache: Optional[types.StatesTorch] = None
 
-    @overrides
     def _predict_step(self, *, controls: types.ControlsTorch) -> None:
         """Predict step."""
         # See Merwe paper [1] for notation
@@ -98,7 +96,6 @@ class UnscentedKalmanFilter(KalmanFilterBase):
         self._belief_covariance = P_k_pred
         self._sigma_point_cache = X_k_pred
 
-    @overrides
     def _update_step(self, *, observations: types.ObservationsTorch) -> None:
         """Update step."""
         # Extract inputs
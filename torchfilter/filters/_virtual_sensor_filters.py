@@ -4,7 +4,6 @@
 from typing import Optional, Tuple
 
 import torch
-from overrides import overrides
 
 from .. import types, utils
 from ..base import (
@@ -34,7 +33,6 @@ class _IdentityMeasurementModel(KalmanFilterMeasurementModel):
 
         super().__init__(state_dim=state_dim, observation_dim=state_dim)
 
-    @overrides
     def forward(
         self, *, states: types.StatesTorch
     ) -> Tuple[types.ObservationsNoDictTorch, types.ScaleTrilTorch]:
@@ -73,7 +71,6 @@ class _IdentityMeasurementModel(KalmanFilterMeasurementModel):
         virtual_observations = states
         return virtual_observations, scale_tril
 
-    @overrides
     def jacobian(self, *, states: types.StatesTorch) -> torch.Tensor:
         """To avoid using autograd for computing our models Jacobian, we can directly
         return identity matrices.
@@ -118,7 +115,6 @@ class _VirtualSensorKalmanFilterMixin(
         self.virtual_sensor_model = virtual_sensor_model
         """torchfilter.base.VirtualSensorModel: Virtual sensor model."""
 
-    @overrides
     def _update_step(self, *, observations: types.ObservationsTorch) -> None:
         (
             virtual_observations,
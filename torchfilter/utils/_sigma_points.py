@@ -6,7 +6,6 @@ from dataclasses import dataclass
 from typing import Optional, Tuple
 
 import torch
-from overrides import overrides
 
 
 class SigmaPointStrategy(abc.ABC):
@@ -54,7 +53,6 @@ class MerweSigmaPointStrategy(SigmaPointStrategy):
     beta: float = 2.0
     kappa: Optional[float] = None
 
-    @overrides
     def compute_lambda(self, dim: int) -> float:
         """Compute sigma point scaling parameter.
 
@@ -67,7 +65,6 @@ class MerweSigmaPointStrategy(SigmaPointStrategy):
         kappa = 3.0 - dim if self.kappa is None else self.kappa
         return (self.alpha ** 2) * (dim + kappa) - dim
 
-    @overrides
     def compute_sigma_weights(self, dim: int) -> Tuple[torch.Tensor, torch.Tensor]:
         """Helper for computing sigma weights.
 
@@ -109,7 +106,6 @@ class JulierSigmaPointStrategy(SigmaPointStrategy):
 
     lambd: Optional[float] = None
 
-    @overrides
     def compute_lambda(self, dim: int) -> float:
         """Compute sigma point scaling parameter.
 
@@ -121,7 +117,6 @@ class JulierSigmaPointStrategy(SigmaPointStrategy):
         """
         return 3.0 - dim if self.lambd is None else self.lambd
 
-    @overrides
     def compute_sigma_weights(self, dim: int) -> Tuple[torch.Tensor, torch.Tensor]:
         """Helper for computing sigma weights.
 